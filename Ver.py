@@ -13,11 +13,16 @@ Features:
 
 import os
 import sys
+import csv
 import json
 import sqlite3
+import random
+import functools
+import queue
 import threading
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Optional: pyserial (may be missing)
@@ -28,12 +33,25 @@ except Exception:
     serial = None
     list_ports = None
 
+# Optional: numba/numpy for the hot numeric kernels (fall back to plain Python)
+try:
+    from numba import njit
+except Exception:
+    njit = None
+try:
+    import numpy as np
+except Exception:
+    np = None
+
 # Optional: reportlab for PDF preview
 try:
     from reportlab.lib.units import inch
     from reportlab.pdfgen import canvas
     from reportlab.graphics.barcode import createBarcodeDrawing
     from reportlab.lib.utils import ImageReader
+    from reportlab import rl_config
+    # our draw calls are fixed-shape; skip reportlab's per-op validation
+    rl_config.shapeChecking = 0
 except Exception:
     createBarcodeDrawing = None
     ImageReader = None
@@ -78,22 +96,35 @@ def ensure_templates():
             ]
         }
         try:
-            with open(default_path, "w", encoding="utf-8") as f:
+            # tmp + rename, same as save_settings: never leave a half-written file
+            tmp = default_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
                 json.dump(sample, f, indent=2)
+            os.replace(tmp, default_path)
         except Exception:
             pass
 
+# dir -> (mtime, listing); adding/removing a template bumps the directory
+# mtime, so a stat is enough to know the cached listing is still good
+_TPL_LIST_CACHE = {}
+
 def list_template_files(templates_dir=None):
     if templates_dir is None:
         templates_dir = TEMPLATES_DIR
     ensure_templates()
-    out = []
     try:
-        for fn in sorted(os.listdir(templates_dir)):
-            if fn.lower().endswith(".json") or fn.lower().endswith(".prn"):
-                out.append(fn)
+        mtime = os.stat(templates_dir).st_mtime
+        cached = _TPL_LIST_CACHE.get(templates_dir)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        # scandir's DirEntry carries the stat from the directory read, so
+        # filtering out subdirectories costs no extra syscall
+        with os.scandir(templates_dir) as it:
+            out = sorted(e.name for e in it
+                         if e.is_file() and e.name.lower().endswith((".json", ".prn")))
+        _TPL_LIST_CACHE[templates_dir] = (mtime, out)
     except Exception:
-        pass
+        return []
     return out
 
 # --- DB / migration ---
@@ -101,6 +132,14 @@ def list_template_files(templates_dir=None):
 def init_db():
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
+    # WAL persists in the DB file and makes writes much cheaper on Windows
+    try:
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.execute("PRAGMA temp_store=MEMORY")
+        c.execute("PRAGMA cache_size=-8000")
+    except Exception:
+        pass
     c.execute('''CREATE TABLE IF NOT EXISTS products (
                     id INTEGER PRIMARY KEY,
                     product_code TEXT UNIQUE,
@@ -128,6 +167,11 @@ def init_db():
     conn.commit()
     conn.close()
 
+def import_products(conn, rows):
+    # one BEGIN/COMMIT for the whole batch instead of a commit per row
+    with conn:
+        conn.executemany('INSERT OR REPLACE INTO products (product_code,name,price_per_lb,tare,plu_upc) VALUES (?,?,?,?,?)', rows)
+
 # --- Settings persistence ---
 
 def load_settings():
@@ -138,7 +182,9 @@ def load_settings():
         "printer_baud": 38400,
         "templates_dir": TEMPLATES_DIR,
         "last_template": None,
-        "custom_prn": ""
+        "custom_prn": "",
+        "confirm_prints": True,
+        "save_pdf_copy": False
     }
     try:
         if os.path.exists(SETTINGS_FILE):
@@ -151,45 +197,124 @@ def load_settings():
 
 def save_settings(s):
     try:
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+        # write to a temp file then rename so a crash never truncates settings
+        tmp = SETTINGS_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
             json.dump(s, f, indent=2)
+        os.replace(tmp, SETTINGS_FILE)
     except Exception:
         pass
 
 # --- UPC helpers ---
 
+# 256-entry lookup tables: digit value pre-multiplied by its UPC weight,
+# indexed directly by ASCII byte (non-digits map to 0)
+_UPC_ODD = bytes((c - 48) * 3 if 48 <= c <= 57 else 0 for c in range(256))
+_UPC_EVEN = bytes(c - 48 if 48 <= c <= 57 else 0 for c in range(256))
+
 def upc_check_digit(digits11):
-    if len(digits11) != 11:
+    b = digits11.encode('ascii')
+    if len(b) != 11 or not b.isdigit():
         raise ValueError("Expected 11 digits")
-    s_odd = sum(int(digits11[i]) for i in range(0, 11, 2))
-    s_even = sum(int(digits11[i]) for i in range(1, 11, 2))
-    total = s_odd * 3 + s_even
-    check = (10 - (total % 10)) % 10
-    return str(check)
+    # fully unrolled: 11 table hits and 10 adds, no loop or generator frame
+    o = _UPC_ODD; e = _UPC_EVEN
+    total = (o[b[0]] + e[b[1]] + o[b[2]] + e[b[3]] + o[b[4]] + e[b[5]]
+             + o[b[6]] + e[b[7]] + o[b[8]] + e[b[9]] + o[b[10]])
+    return str((10 - total % 10) % 10)
+
+def _upc12_int(plu, cents):
+    # pure-int kernel so numba can compile it when present: build the 11
+    # digit core as a number, walk its digits for the checksum, return the
+    # full 12-digit value
+    core = 2 * 100000000000 + plu * 1000000 + cents * 10
+    n = core // 10
+    total = 0
+    odd = True  # digit at 10**0 of the core sits at an odd UPC position
+    while n:
+        d = n % 10
+        total += d * 3 if odd else d
+        n //= 10
+        odd = not odd
+    return core + (10 - total % 10) % 10
+
+if njit is not None:
+    _upc12_int = njit(cache=True)(_upc12_int)
 
 def make_price_embedded_upc(plu5, price_cents):
-    p = str(plu5).zfill(5)
-    p5 = str(int(price_cents)).zfill(5)
-    core = '2' + p + p5
-    return core + upc_check_digit(core)
+    plu = int(plu5); cents = int(price_cents)
+    # the kernel has no notion of field widths; out-of-range values would
+    # silently bleed into neighboring digits and mis-price the label
+    if not (0 <= plu <= 99999 and 0 <= cents <= 99999):
+        raise ValueError("PLU and price cents must each fit in 5 digits")
+    return f"{_upc12_int(plu, cents):012d}"
 
 # --- Scale interface ---
 
+# weight patterns compiled once; the read loop matches raw bytes so it also
+# skips a decode per line
+_WEIGHT_RE = re.compile(r'(\d+\.\d+)')
+_WEIGHT_RE_B = re.compile(rb'(\d+\.\d+)')
+
+# median of the 5-sample smoothing ring; JITted when numba+numpy are around
+if np is not None and njit is not None:
+    @njit(cache=True)
+    def _median5(a):
+        b = a.copy()
+        b.sort()
+        return b[2]
+else:
+    def _median5(a):
+        return sorted(a)[2]
+
 class ScaleInterface:
     def __init__(self, port='Simulate', baud=9600):
         self.port = port
         self.baud = int(baud)
         self.simulate = (self.port == 'Simulate') or (serial is None)
         self._running = False
+        self._stop_evt = threading.Event()
         self._thread = None
         self._last_trigger = 0.0
         self.on_print = None
+        # cached port handle for read_once; the listener thread owns its own
+        self._ser = None
+        self._ser_key = None
+        # 5-sample ring for median smoothing of real serial readings
+        self._ring = np.zeros(5, dtype=np.float32) if np is not None else [0.0] * 5
+        self._ring_i = 0
+        self._ring_n = 0
+
+    def _get_serial(self, timeout=1.0):
+        key = (self.port, self.baud)
+        if self._ser is not None and self._ser_key == key and self._ser.is_open:
+            self._ser.timeout = timeout
+            return self._ser
+        self._close_serial()
+        self._ser = serial.Serial(self.port, self.baud, timeout=timeout)
+        self._ser_key = key
+        return self._ser
+
+    def _close_serial(self):
+        if self._ser is not None:
+            try:
+                self._ser.close()
+            except Exception:
+                pass
+            self._ser = None
 
     def start(self):
         if self._running:
             return
         self._running = True
+        self._stop_evt.clear()
+        # fresh smoothing window per session; stale samples from a previous
+        # listen must never feed the first median
+        self._ring_i = 0
+        self._ring_n = 0
         self.simulate = (self.port == 'Simulate') or (serial is None)
+        # the read loop opens the port itself; release any manual-read handle
+        if not self.simulate:
+            self._close_serial()
         if self.simulate:
             self._thread = threading.Thread(target=self._simulate_loop, daemon=True)
         else:
@@ -198,14 +323,16 @@ class ScaleInterface:
 
     def stop(self):
         self._running = False
+        self._stop_evt.set()
         if self._thread:
             self._thread.join(timeout=0.5)
             self._thread = None
+        self._close_serial()
 
     def _simulate_loop(self):
-        import random
-        while self._running:
-            time.sleep(5)
+        # wait() instead of sleep() so stop() interrupts immediately rather
+        # than stranding on_close for up to 5 s
+        while not self._stop_evt.wait(5.0):
             w = round(random.uniform(0.5, 8.0), 3)
             self._trigger(w)
 
@@ -213,23 +340,51 @@ class ScaleInterface:
         if serial is None:
             print("pyserial not available")
             return
-        try:
-            with serial.Serial(self.port, self.baud, timeout=1) as ser:
-                while self._running:
-                    raw = ser.readline().decode(errors='ignore').strip()
-                    if not raw:
-                        continue
-                    m = re.search(r'(\d+\.\d+)', raw)
-                    if m:
-                        try:
-                            w = float(m.group(1))
-                        except Exception:
+        delay = 0.5
+        while self._running:
+            try:
+                with serial.Serial(self.port, self.baud, timeout=0.05) as ser:
+                    delay = 0.5
+                    buf = bytearray()
+                    while self._running:
+                        # bulk read: one wakeup per buffered chunk, not per byte
+                        chunk = ser.read(max(1, ser.in_waiting))
+                        if not chunk:
                             continue
-                        self._trigger(w)
-        except Exception as e:
-            print("Scale read thread error:", e)
+                        buf += chunk
+                        # fire one trigger per complete line
+                        while True:
+                            nl = buf.find(b'\n')
+                            if nl < 0:
+                                break
+                            line = bytes(buf[:nl]); del buf[:nl + 1]
+                            m = _WEIGHT_RE_B.search(line)
+                            if m:
+                                try:
+                                    w = float(m.group(1).decode())
+                                except Exception:
+                                    continue
+                                self._trigger(w)
+                    return
+            except Exception as e:
+                print("Scale read thread error:", e)
+                # bounded backoff before reopening a flaky port; waiting on
+                # the stop event keeps shutdown instantaneous
+                if self._stop_evt.wait(delay):
+                    return
+                delay = min(delay * 2, 5.0)
 
     def _trigger(self, weight):
+        if not self.simulate:
+            # real scales are noisy while the piece settles; smooth with a
+            # median-of-5 so one corrupted line cannot fire a print by itself
+            self._ring[self._ring_i] = weight
+            self._ring_i = (self._ring_i + 1) % 5
+            if self._ring_n < 5:
+                self._ring_n += 1
+                if self._ring_n < 5:
+                    return
+            weight = float(_median5(self._ring))
         now = time.time()
         if now - self._last_trigger < 1.2:
             return
@@ -242,112 +397,203 @@ class ScaleInterface:
 
     def read_once(self, timeout=1.0):
         if self.simulate:
-            import random
             return round(random.uniform(0.5, 8.0), 3)
         if serial is None:
             raise RuntimeError("pyserial not installed")
         try:
-            with serial.Serial(self.port, self.baud, timeout=timeout) as ser:
-                raw = ser.readline().decode(errors='ignore').strip()
-                m = re.search(r'(\d+\.\d+)', raw)
-                if m:
-                    return float(m.group(1))
+            ser = self._get_serial(timeout)
+            raw = ser.readline().decode(errors='ignore').strip()
+            m = _WEIGHT_RE.search(raw)
+            if m:
+                return float(m.group(1))
         except Exception as e:
+            self._close_serial()
             print("Read once error:", e)
         return 0.0
 
 # --- PDF generation via JSON template ---
 
-def generate_label_pdf(output_path, template, content):
-    if createBarcodeDrawing is None:
-        raise RuntimeError("reportlab not installed")
-    size_in = template.get('size_in', LIST := LABEL_DEFAULT_SIZE)
-    w = size_in[0] * inch
-    h = size_in[1] * inch
-    c = canvas.Canvas(output_path, pagesize=(w, h))
-    font = template.get('font', 'Helvetica')
+# display-string formatter per known field name; unknown names fall back to
+# a plain content lookup in _compile_pdf_fields
+_PDF_FIELD_FMTS = {
+    'product_name': lambda c: c.get('product_name', ''),
+    'weight': lambda c: f"Weight: {float(c.get('weight', 0)):.3f} lb",
+    'price_per_lb': lambda c: f"{float(c.get('price_per_lb', 0)):.2f} /lb",
+    'total_price': lambda c: f"Total: ${float(c.get('total_price', 0)):.2f}",
+    'sell_by': lambda c: f"Sell by: {c.get('sell_by', '')}",
+    'lot': lambda c: f"Lot: {c.get('lot', '')}",
+}
+
+@functools.lru_cache(maxsize=256)
+def _upc_drawing(code, bar_h):
+    # UPC-A geometry is fully determined by (value, height); Drawing objects
+    # are stateless for drawOn, so one instance can serve every canvas
+    return createBarcodeDrawing('UPCA', value=code, barHeight=bar_h, humanReadable=True)
+
+def _compile_pdf_fields(template):
+    # one (x_pts, y_pts, size, fmt) per field with inch math done up front;
+    # barcode entries carry fmt=None and the bar height in the size slot.
+    # Stored on the template dict, so it lives exactly as long as the cached
+    # parse and is rebuilt whenever the file changes on disk.
+    fields = []
     for fld in template.get('fields', []):
         name = fld.get('name')
         x = fld.get('x', 0) * inch
         y = fld.get('y', 0) * inch
-        size = fld.get('size', 8)
         if name == 'barcode':
+            fields.append((x, y, fld.get('height', 0.3) * inch, None))
+        else:
+            fmt = _PDF_FIELD_FMTS.get(name) or (lambda c, n=name: str(c.get(n, '')))
+            fields.append((x, y, fld.get('size', 8), fmt))
+    template['_pdf_fields'] = fields
+    return fields
+
+def _draw_label_fields(c, template, content):
+    font = template.get('font', 'Helvetica')
+    last_font = None
+    fields = template.get('_pdf_fields')
+    if fields is None:
+        fields = _compile_pdf_fields(template)
+    for x, y, size, fmt in fields:
+        if fmt is None:
             code = content.get('upc', '')
             try:
-                drawing = createBarcodeDrawing('UPCA', value=code, barHeight=fld.get('height', 0.3) * inch, humanReadable=True)
-                drawing.drawOn(c, x, y)
+                _upc_drawing(code, size).drawOn(c, x, y)
             except Exception:
                 c.setFont(font, 6)
+                last_font = (font, 6)
                 c.drawString(x, y, 'UPC:' + code)
             continue
-        # map known field names to display strings
-        if name == 'product_name':
-            text = content.get('product_name', '')
-        elif name == 'weight':
-            text = f"Weight: {float(content.get('weight', 0)):.3f} lb"
-        elif name == 'price_per_lb':
-            text = f"{float(content.get('price_per_lb', 0)):.2f} /lb"
-        elif name == 'total_price':
-            text = f"Total: ${float(content.get('total_price', 0)):.2f}"
-        elif name == 'sell_by':
-            text = f"Sell by: {content.get('sell_by', '')}"
-        elif name == 'lot':
-            text = f"Lot: {content.get('lot', '')}"
-        else:
-            text = str(content.get(name, ''))
-        try:
-            c.setFont(font, size)
-        except Exception:
-            c.setFont('Helvetica', size)
-        c.drawString(x, y, text)
-    c.showPage()
+        # only emit a Tf operator when font/size actually change
+        if (font, size) != last_font:
+            try:
+                c.setFont(font, size)
+            except Exception:
+                c.setFont('Helvetica', size)
+            last_font = (font, size)
+        c.drawString(x, y, fmt(content))
+
+def generate_label_pdf(output_path, template, content):
+    generate_labels_pdf(output_path, template, (content,))
+
+def generate_labels_pdf(output_path, template, contents):
+    # batch entry point: one canvas / one file for any number of labels
+    if createBarcodeDrawing is None:
+        raise RuntimeError("reportlab not installed")
+    size_in = template.get('size_in', LABEL_DEFAULT_SIZE)
+    w = size_in[0] * inch
+    h = size_in[1] * inch
+    c = canvas.Canvas(output_path, pagesize=(w, h))
+    for content in contents:
+        _draw_label_fields(c, template, content)
+        c.showPage()
     c.save()
 
 # --- PRN handling (load + placeholder substitution) ---
 
+# parsed JSON templates and raw PRN text keyed by path, invalidated on mtime
+_TEMPLATE_CACHE = {}  # path -> (mtime, parsed dict | PRN text)
+
+def get_template(path):
+    try:
+        mtime = os.path.getmtime(path)
+    except Exception:
+        mtime = None
+    hit = _TEMPLATE_CACHE.get(path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            tpl = json.load(f)
+    except Exception as e:
+        print("Load template failed:", e)
+        return None
+    _TEMPLATE_CACHE[path] = (mtime, tpl)
+    return tpl
+
 def load_prn(path):
     try:
+        mtime = os.path.getmtime(path)
+        hit = _TEMPLATE_CACHE.get(path)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
         with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-            return f.read()
+            txt = f.read()
+        _TEMPLATE_CACHE[path] = (mtime, txt)
+        return txt
     except Exception as e:
         print("Load PRN failed:", e)
         return None
 
+# placeholder metadata is content-independent; per render the values are
+# %-formatted into a fixed-shape list instead of allocating fresh dicts
+_PLACEHOLDER_KEYS = ('product_name', 'weight', 'price_per_lb', 'total_price', 'sell_by', 'lot', 'upc')
+_PLACEHOLDER_FMTS = ('%s', '%.3f', '%.2f', '%.2f', '%s', '%s', '%s')
+_PLACEHOLDER_NUMERIC = (False, True, True, True, False, False, False)
+_PLACEHOLDER_INDEX = {k: i for i, k in enumerate(_PLACEHOLDER_KEYS)}
+# one alternation matching every placeholder in a single text scan: the
+# {name} forms (case-insensitive) and the angle-bracket aliases used by
+# stock Datamax PRN files (case-sensitive, hence the scoped (?i:) group)
+_ANGLE_INDEX = {'KillDate': 5, 'WtLbs': 1, 'PluWgtSer': 6, 'SellBy1': 4}
+_PRN_RE = re.compile(r'(?i:\{(' + '|'.join(_PLACEHOLDER_KEYS) + r')\})'
+                     r'|<(' + '|'.join(_ANGLE_INDEX) + r')>')
+
+def format_placeholder_values(content):
+    vals = []
+    for k, fmt, num in zip(_PLACEHOLDER_KEYS, _PLACEHOLDER_FMTS, _PLACEHOLDER_NUMERIC):
+        if num:
+            vals.append(fmt % float(content.get(k, 0)))
+        else:
+            vals.append(fmt % content.get(k, ''))
+    return vals
+
 def render_prn_template(path, content):
     txt = load_prn(path)
     if txt is None:
         return None
-    # substitution map
-    subs = {
-        'product_name': content.get('product_name', ''),
-        'weight': f"{float(content.get('weight',0)):.3f}",
-        'price_per_lb': f"{float(content.get('price_per_lb',0)):.2f}",
-        'total_price': f"{float(content.get('total_price',0)):.2f}",
-        'sell_by': content.get('sell_by', ''),
-        'lot': content.get('lot', ''),
-        'upc': content.get('upc', '')
-    }
-    # curly placeholders {name}
-    for k, v in subs.items():
-        txt = re.sub(r"\{" + re.escape(k) + r"\}", str(v), txt, flags=re.IGNORECASE)
-    # common angle-bracket placeholders mapping
-    angle_map = {
-        '<KillDate>': subs.get('lot',''),
-        '<WtLbs>': subs.get('weight',''),
-        '<PluWgtSer>': subs.get('upc',''),
-        '<SellBy1>': subs.get('sell_by','')
-    }
-    for a,b in angle_map.items():
-        txt = txt.replace(a, str(b))
-    return txt
+    values = format_placeholder_values(content)
+    def repl(m, values=values):
+        k = m.group(1)
+        if k is not None:
+            return values[_PLACEHOLDER_INDEX[k.lower()]]
+        return values[_ANGLE_INDEX[m.group(2)]]
+    return _PRN_RE.sub(repl, txt)
+
+def load_all_templates(templates_dir=None):
+    # parse JSON templates / read PRN text once up front; App keeps the result
+    if templates_dir is None:
+        templates_dir = TEMPLATES_DIR
+    names = list_template_files(templates_dir)
+    def load_one(fn):
+        path = os.path.join(templates_dir, fn)
+        try:
+            return fn, get_template(path) if fn.lower().endswith('.json') else load_prn(path)
+        except Exception:
+            return fn, None
+    # I/O-bound, so a small pool overlaps the disk reads at startup; each
+    # worker touches a distinct cache key, so the shared dict is safe
+    if len(names) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, len(names))) as ex:
+            results = list(ex.map(load_one, names))
+    else:
+        results = [load_one(fn) for fn in names]
+    out = {}
+    for fn, tpl in results:
+        if tpl is not None:
+            out[fn] = tpl
+    return out
 
-def send_prn_to_printer(port, baud, payload):
+def send_prn_to_printer(port, baud, payload, ser=None):
     if serial is None:
         raise RuntimeError("pyserial not installed")
     if isinstance(payload, str):
         data = payload.encode('ascii', errors='replace')
     else:
         data = payload
+    if ser is not None:
+        # caller owns a long-lived handle; skip the open/close cycle
+        ser.write(data)
+        return
     with serial.Serial(port, int(baud), timeout=2) as ser:
         ser.write(data)
 
@@ -356,47 +602,94 @@ def send_prn_to_printer(port, baud, payload):
 def inches_to_dots(v_in, dpi=203):
     return int(round(v_in * dpi))
 
-def generate_datamax_from_template(template, content, dpi=203):
-    lines = ['N']
+# compiled templates: a list of str literals (static command text) interleaved
+# with int holes (index into format_placeholder_values) or (name,) holes for
+# custom fields resolved from content at render time
+_DATAMAX_CACHE = {}  # (tpl_path, mtime, dpi) -> compiled parts
+
+def compile_datamax_template(template, dpi=203):
+    parts = []
     width = inches_to_dots(template.get('size_in', LABEL_DEFAULT_SIZE)[0], dpi)
     height = inches_to_dots(template.get('size_in', LABEL_DEFAULT_SIZE)[1], dpi)
-    lines.append(f'q{width}')
-    lines.append(f'Q{height},24')
+    parts.append(f'N\nq{width}\nQ{height},24\n')
     for fld in template.get('fields', []):
         name = fld.get('name')
         x = inches_to_dots(fld.get('x', 0), dpi)
         y = inches_to_dots(fld.get('y', 0), dpi)
         if name == 'barcode':
-            code = content.get('upc', '')
             h = inches_to_dots(fld.get('height', 0.3), dpi)
-            lines.append(f'B{x},{y},0,E30,2,2,{h},N,"{code}"')
+            parts.append(f'B{x},{y},0,E30,2,2,{h},N,"')
+            parts.append(_PLACEHOLDER_KEYS.index('upc'))
+            parts.append('"\n')
+            continue
+        parts.append(f'A{x},{y},0,3,1,1,N,"')
+        if name == 'product_name':
+            parts.append(_PLACEHOLDER_KEYS.index('product_name')); parts.append('"\n')
+        elif name == 'weight':
+            parts.append(_PLACEHOLDER_KEYS.index('weight')); parts.append(' lb"\n')
+        elif name == 'price_per_lb':
+            parts.append(_PLACEHOLDER_KEYS.index('price_per_lb')); parts.append(' /lb"\n')
+        elif name == 'total_price':
+            parts.append('Total: $'); parts.append(_PLACEHOLDER_KEYS.index('total_price')); parts.append('"\n')
+        elif name == 'sell_by':
+            parts.append('Sell by: '); parts.append(_PLACEHOLDER_KEYS.index('sell_by')); parts.append('"\n')
+        elif name == 'lot':
+            parts.append('Lot: '); parts.append(_PLACEHOLDER_KEYS.index('lot')); parts.append('"\n')
         else:
-            if name == 'product_name':
-                text = content.get('product_name','')
-            elif name == 'weight':
-                text = f"{float(content.get('weight',0)):.3f} lb"
-            elif name == 'price_per_lb':
-                text = f"{float(content.get('price_per_lb',0)):.2f} /lb"
-            elif name == 'total_price':
-                text = f"Total: ${float(content.get('total_price',0)):.2f}"
-            elif name == 'sell_by':
-                text = f"Sell by: {content.get('sell_by','')}"
-            elif name == 'lot':
-                text = f"Lot: {content.get('lot','')}"
-            else:
-                text = str(content.get(name,''))
-            lines.append(f'A{x},{y},0,3,1,1,N,"{text}"')
-    lines.append('P1')
-    return '\n'.join(lines)
+            parts.append((name,)); parts.append('"\n')
+    parts.append('P1\n')
+    # merge adjacent literals and encode them once, so render only splices
+    # the per-label values into ready-made ASCII chunks
+    merged = []
+    for p in parts:
+        if isinstance(p, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += p
+        else:
+            merged.append(p)
+    return [p.encode('ascii', 'replace') if isinstance(p, str) else p for p in merged]
+
+def get_compiled_datamax(tpl_path, template, dpi=203):
+    try:
+        mtime = os.path.getmtime(tpl_path)
+    except Exception:
+        mtime = 0.0
+    key = (tpl_path, mtime, dpi)
+    compiled = _DATAMAX_CACHE.get(key)
+    if compiled is None:
+        compiled = compile_datamax_template(template, dpi)
+        _DATAMAX_CACHE[key] = compiled
+    return compiled
+
+def render_datamax(compiled, content):
+    # returns bytes ready for serial.write; no str->bytes churn downstream
+    if len(compiled) == 1 and isinstance(compiled[0], bytes):
+        # fully static template: the compiled prefix is the whole payload
+        return compiled[0]
+    values = None
+    buf = bytearray()
+    for p in compiled:
+        if isinstance(p, bytes):
+            buf += p
+        elif isinstance(p, int):
+            if values is None:
+                values = format_placeholder_values(content)
+            buf += values[p].encode('ascii', 'replace')
+        else:
+            buf += str(content.get(p[0], '')).encode('ascii', 'replace')
+    return bytes(buf)
+
+def generate_datamax_from_template(template, content, dpi=203):
+    return render_datamax(compile_datamax_template(template, dpi), content)
 
 # --- Product manager window ---
 
 class ProductManager(tk.Toplevel):
-    def __init__(self, parent, refresh_cb):
+    def __init__(self, parent, refresh_cb, conn):
         super().__init__(parent)
         self.title('Product Manager')
         self.geometry('720x420')
         self.refresh_cb = refresh_cb
+        self.conn = conn
         self.build_ui()
         self.load()
 
@@ -410,13 +703,12 @@ class ProductManager(tk.Toplevel):
         ttk.Button(btns, text='Add', command=self.add).pack(side='left', padx=4)
         ttk.Button(btns, text='Edit', command=self.edit).pack(side='left', padx=4)
         ttk.Button(btns, text='Delete', command=self.delete).pack(side='left', padx=4)
+        ttk.Button(btns, text='Import CSV', command=self.import_csv).pack(side='left', padx=4)
 
     def load(self):
         for i in self.tree.get_children(): self.tree.delete(i)
-        conn = sqlite3.connect(DB_FILE); c = conn.cursor(); c.execute('SELECT product_code,name,price_per_lb,tare,plu_upc FROM products')
-        for r in c.fetchall():
+        for r in self.conn.execute('SELECT product_code,name,price_per_lb,tare,plu_upc FROM products').fetchall():
             self.tree.insert('', 'end', values=(r[0], r[1], f'{r[2]:.2f}', f'{r[3]:.3f}', r[4] or ''))
-        conn.close()
 
     def add(self): self.editor()
     def edit(self):
@@ -428,7 +720,37 @@ class ProductManager(tk.Toplevel):
         if not sel: return
         vals = self.tree.item(sel[0])['values']
         if messagebox.askyesno('Delete', f'Delete {vals[0]}?'):
-            conn = sqlite3.connect(DB_FILE); c = conn.cursor(); c.execute('DELETE FROM products WHERE product_code=?',(vals[0],)); conn.commit(); conn.close(); self.load(); self.refresh_cb()
+            with self.conn:
+                self.conn.execute('DELETE FROM products WHERE product_code=?', (vals[0],))
+            self.load(); self.refresh_cb()
+
+    def import_csv(self):
+        # columns: product_code,name,price_per_lb[,tare[,plu_upc]]
+        path = filedialog.askopenfilename(filetypes=[('CSV files', '*.csv'), ('All files', '*.*')])
+        if not path:
+            return
+        rows = []
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                for rec in csv.reader(f):
+                    if len(rec) < 3:
+                        continue
+                    code = rec[0].strip(); name = rec[1].strip()
+                    if not code or not name or code.lower() in ('product_code', 'code'):
+                        continue
+                    try: price = float(rec[2])
+                    except Exception: price = 0.0
+                    try: tare = float(rec[3]) if len(rec) > 3 and rec[3].strip() else 0.0
+                    except Exception: tare = 0.0
+                    plu = rec[4].strip() if len(rec) > 4 else ''
+                    rows.append((code, name, price, tare, plu))
+        except Exception as e:
+            messagebox.showerror('Import CSV', f'Failed reading CSV: {e}'); return
+        if not rows:
+            messagebox.showinfo('Import CSV', 'No rows to import'); return
+        import_products(self.conn, rows)
+        self.load(); self.refresh_cb()
+        messagebox.showinfo('Import CSV', f'Imported {len(rows)} products')
 
     def editor(self, vals=None):
         w = tk.Toplevel(self); w.title('Edit Product'); w.geometry('420x220')
@@ -445,33 +767,57 @@ class ProductManager(tk.Toplevel):
             except: tare = 0.0
             plu = vars[4].get().strip()
             if not code or not name: messagebox.showerror('Error','Code and Name required'); return
-            conn = sqlite3.connect(DB_FILE); c = conn.cursor(); c.execute('INSERT OR REPLACE INTO products (product_code,name,price_per_lb,tare,plu_upc) VALUES (?,?,?,?,?)', (code, name, price, tare, plu)); conn.commit(); conn.close(); w.destroy(); self.load(); self.refresh_cb()
+            with self.conn:
+                self.conn.execute('INSERT OR REPLACE INTO products (product_code,name,price_per_lb,tare,plu_upc) VALUES (?,?,?,?,?)', (code, name, price, tare, plu))
+            w.destroy(); self.load(); self.refresh_cb()
         ttk.Button(w, text='Save', command=save).grid(column=0, row=len(labels), columnspan=2, sticky='ew', padx=8, pady=8)
 
 # --- Options window ---
 
+# snapshot of serial port names; comports() does a full device scan on
+# Windows, so enumerate once and re-scan only on explicit refresh
+_PORTS_CACHE = None
+
+def enumerate_ports(refresh=False):
+    global _PORTS_CACHE
+    if _PORTS_CACHE is None or refresh:
+        names = []
+        try:
+            if list_ports is not None:
+                names = [p.device for p in list_ports.comports()]
+        except Exception:
+            names = []
+        if not names:
+            names = [f'COM{i}' for i in range(1, 21)]
+        _PORTS_CACHE = names
+    return _PORTS_CACHE
+
 class OptionsWindow(tk.Toplevel):
-    def __init__(self, parent, settings, apply_cb):
+    def __init__(self, parent, settings, apply_cb, app=None):
         super().__init__(parent)
         self.title('Options'); self.geometry('720x420'); self.settings = settings; self.apply_cb = apply_cb
+        self.app = app
         self.build_ui()
 
     def build_ui(self):
         frm = ttk.Frame(self, padding=10); frm.grid(sticky='nw')
         ttk.Label(frm, text='Scale Port:').grid(column=0,row=0,sticky='w')
         self.scale_port = tk.StringVar(value=self.settings.get('scale_port','Simulate'))
-        ports = ['Simulate'] + [f'COM{i}' for i in range(1,21)]
-        ttk.Combobox(frm, textvariable=self.scale_port, values=ports, state='readonly').grid(column=1,row=0,sticky='w')
+        ports = enumerate_ports()
+        self.scale_port_cb = ttk.Combobox(frm, textvariable=self.scale_port, values=['Simulate'] + ports, state='readonly')
+        self.scale_port_cb.grid(column=1,row=0,sticky='w')
         ttk.Label(frm, text='Scale Baud:').grid(column=2,row=0,sticky='w'); self.scale_baud = tk.IntVar(value=self.settings.get('scale_baud',9600))
         ttk.Combobox(frm, textvariable=self.scale_baud, values=[9600,19200,38400,57600,115200], state='readonly').grid(column=3,row=0,sticky='w')
         ttk.Button(frm, text='Test Scale', command=self.test_scale).grid(column=4,row=0,sticky='w')
 
         ttk.Label(frm, text='Printer Port:').grid(column=0,row=1,sticky='w')
         self.printer_port = tk.StringVar(value=self.settings.get('printer_port','COM1'))
-        ttk.Combobox(frm, textvariable=self.printer_port, values=[f'COM{i}' for i in range(1,21)], state='readonly').grid(column=1,row=1,sticky='w')
+        self.printer_port_cb = ttk.Combobox(frm, textvariable=self.printer_port, values=ports, state='readonly')
+        self.printer_port_cb.grid(column=1,row=1,sticky='w')
         ttk.Label(frm, text='Printer Baud:').grid(column=2,row=1,sticky='w'); self.printer_baud = tk.IntVar(value=self.settings.get('printer_baud',38400))
         ttk.Combobox(frm, textvariable=self.printer_baud, values=[9600,19200,38400,57600,115200], state='readonly').grid(column=3,row=1,sticky='w')
         ttk.Button(frm, text='Test Printer', command=self.test_printer).grid(column=4,row=1,sticky='w')
+        ttk.Button(frm, text='Refresh Ports', command=self.refresh_ports).grid(column=5,row=0,rowspan=2,sticky='w')
 
         ttk.Label(frm, text='Templates folder:').grid(column=0,row=2,sticky='w')
         self.templates_dir_var = tk.StringVar(value=self.settings.get('templates_dir', TEMPLATES_DIR))
@@ -485,7 +831,18 @@ class OptionsWindow(tk.Toplevel):
         self.custom_prn.delete('1.0','end')
         self.custom_prn.insert('1.0', self.settings.get('custom_prn') or 'N\nq406\nQ406,24\nA20,20,0,2,1,1,N,"TEST"\nP1\n')
 
-        ttk.Button(frm, text='Save', command=self.save).grid(column=1,row=5,sticky='w', pady=8)
+        self.confirm_prints = tk.BooleanVar(value=bool(self.settings.get('confirm_prints', True)))
+        ttk.Checkbutton(frm, text='Show dialog after each print', variable=self.confirm_prints).grid(column=1,row=4,sticky='w')
+
+        self.save_pdf_copy = tk.BooleanVar(value=bool(self.settings.get('save_pdf_copy', False)))
+        ttk.Checkbutton(frm, text='Save a PDF copy of each printed label', variable=self.save_pdf_copy).grid(column=1,row=5,sticky='w')
+
+        ttk.Button(frm, text='Save', command=self.save).grid(column=1,row=6,sticky='w', pady=8)
+
+    def refresh_ports(self):
+        ports = enumerate_ports(refresh=True)
+        self.scale_port_cb['values'] = ['Simulate'] + ports
+        self.printer_port_cb['values'] = ports
 
     def browse_templates(self):
         d = filedialog.askdirectory(initialdir=self.templates_dir_var.get())
@@ -508,6 +865,10 @@ class OptionsWindow(tk.Toplevel):
             messagebox.showinfo('Scale Test', 'Simulation mode or pyserial missing')
             return
         try:
+            if self.app is not None and getattr(self.app.scale, 'port', None) == port:
+                # Read Weight leaves a cached handle holding the port open;
+                # release it so this exclusive open cannot collide with it
+                self.app.scale._close_serial()
             with serial.Serial(port, baud, timeout=2) as ser:
                 ser.write(b'\r\n')
                 resp = ser.readline().decode(errors='ignore').strip()
@@ -521,8 +882,12 @@ class OptionsWindow(tk.Toplevel):
             messagebox.showerror('Printer Test', 'pyserial not installed')
             return
         try:
-            with serial.Serial(self.printer_port.get(), int(self.printer_baud.get()), timeout=2) as ser:
-                ser.write(prn.encode('ascii', errors='replace'))
+            port = self.printer_port.get(); baud = int(self.printer_baud.get())
+            if self.app is not None:
+                self.app.send_raw_prn(port, baud, prn)
+            else:
+                with serial.Serial(port, baud, timeout=2) as ser:
+                    ser.write(prn.encode('ascii', errors='replace'))
             messagebox.showinfo('Printer Test', 'Custom PRN sent to printer')
         except Exception as e:
             messagebox.showerror('Printer Test Failed', str(e))
@@ -534,6 +899,8 @@ class OptionsWindow(tk.Toplevel):
         self.settings['printer_baud'] = int(self.printer_baud.get())
         self.settings['templates_dir'] = self.templates_dir_var.get()
         self.settings['custom_prn'] = self.custom_prn.get('1.0','end')
+        self.settings['confirm_prints'] = bool(self.confirm_prints.get())
+        self.settings['save_pdf_copy'] = bool(self.save_pdf_copy.get())
         save_settings(self.settings)
         # Apply -> parent will reload templates / settings
         try:
@@ -550,6 +917,8 @@ class App:
         root.title('L+D Turkey Labeler')
         ensure_templates(); init_db()
         self.settings = load_settings()
+        self._serial_available = serial is not None
+        self._refresh_hot_settings()
         # if templates_dir changed, update global
         global TEMPLATES_DIR
         TEMPLATES_DIR = self.settings.get('templates_dir', TEMPLATES_DIR)
@@ -557,15 +926,98 @@ class App:
         self.template_files = list_template_files(self.settings.get('templates_dir', TEMPLATES_DIR))
         if not self.settings.get('last_template') and self.template_files:
             self.settings['last_template'] = self.template_files[0]
-        # DB connection
+        # parsed-template cache; refreshed in the background on mtime change
+        self._reload_tpl_cache()
+        # shared DB connection, reused by every query and ProductManager
         self.conn = sqlite3.connect(DB_FILE)
+        try:
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+            self.conn.execute("PRAGMA cache_size=-8000")
+        except Exception:
+            pass
         # scale interface
-        self.scale = ScaleInterface(port=self.settings.get('scale_port','Simulate'), baud=self.settings.get('scale_baud',9600))
+        self.scale = ScaleInterface(port=self._scale_port, baud=self._scale_baud)
         self.scale.on_print = self.handle_scale_print
+        # debounced settings persistence (see _schedule_save)
+        self._settings_after_id = None
+        # single worker so PDF rendering never blocks the Tk thread
+        self._pdf_pool = ThreadPoolExecutor(max_workers=1)
+        self._pdf_busy = False
+        # lazily opened printer handles keyed by (port, baud), reused across prints
+        self._serial_cache = {}
+        self._printer_lock = threading.Lock()
+        # serial writes are drained by a dedicated worker so the UI never blocks
+        self._print_q = queue.Queue()
+        threading.Thread(target=self._print_worker, daemon=True).start()
+        # worker threads enqueue callables here; one periodic Tk task drains
+        # them, instead of taking the Tcl lock per after(0, ...) call
+        self._ui_q = queue.Queue()
+        # pending debounced auto-print (see handle_scale_print)
+        self._pending_print_id = None
+        self._last_weight = None
+        self._auto_mode = False
         # don't auto-start listening, user toggles
         self.build_ui()
         # set window close protocol
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(50, self._drain_ui_queue)
+        self.root.after(5000, self._refresh_tpl_cache)
+
+    def _drain_ui_queue(self):
+        try:
+            while True:
+                fn = self._ui_q.get_nowait()
+                try:
+                    fn()
+                except Exception:
+                    pass
+        except queue.Empty:
+            pass
+        self.root.after(50, self._drain_ui_queue)
+
+    def _reload_tpl_cache(self):
+        tdir = self.settings.get('templates_dir', TEMPLATES_DIR)
+        self._tpl_cache = load_all_templates(tdir)
+        self._tpl_mtimes = {}
+        for name in self._tpl_cache:
+            try:
+                self._tpl_mtimes[name] = os.path.getmtime(os.path.join(tdir, name))
+            except Exception:
+                pass
+
+    def _get_template(self, name):
+        tpl = self._tpl_cache.get(name)
+        if tpl is None:
+            path = os.path.join(self.settings.get('templates_dir', TEMPLATES_DIR), name)
+            try:
+                tpl = get_template(path) if name.lower().endswith('.json') else load_prn(path)
+            except Exception:
+                return None
+            if tpl is not None:
+                self._tpl_cache[name] = tpl
+                try:
+                    self._tpl_mtimes[name] = os.path.getmtime(path)
+                except Exception:
+                    pass
+        return tpl
+
+    def _refresh_tpl_cache(self):
+        # drop stale entries; _get_template reloads them lazily on next use
+        tdir = self.settings.get('templates_dir', TEMPLATES_DIR)
+        for name in list(self._tpl_cache):
+            try:
+                m = os.path.getmtime(os.path.join(tdir, name))
+            except Exception:
+                self._tpl_cache.pop(name, None)
+                self._tpl_mtimes.pop(name, None)
+                continue
+            if m != self._tpl_mtimes.get(name):
+                self._tpl_cache.pop(name, None)
+        try:
+            self.root.after(5000, self._refresh_tpl_cache)
+        except Exception:
+            pass
 
     def build_ui(self):
         frm = ttk.Frame(self.root, padding=10); frm.grid()
@@ -593,18 +1045,46 @@ class App:
         self.lot_var = tk.StringVar(value=self.settings.get('lot',''))
         ttk.Entry(frm, textvariable=self.lot_var).grid(column=1, row=4, sticky='w')
 
+        ttk.Label(frm, text='Copies:').grid(column=2, row=4, sticky='e')
+        self.copies_var = tk.IntVar(value=1)
+        ttk.Spinbox(frm, from_=1, to=99, width=4, textvariable=self.copies_var).grid(column=3, row=4, sticky='w')
+
         self.preview_btn = ttk.Button(frm, text='Preview (PDF)', command=self.preview)
         self.preview_btn.grid(column=0, row=5, sticky='w')
-        ttk.Button(frm, text='Print to Printer', command=self.print_action).grid(column=1, row=5, sticky='w')
+        self.print_btn = ttk.Button(frm, text='Print to Printer', command=self.print_action)
+        self.print_btn.grid(column=1, row=5, sticky='w')
+        if not self._serial_available:
+            self.print_btn.config(state='disabled', text='Print (pyserial missing)')
         ttk.Button(frm, text='Start Listening', command=self.toggle_listen).grid(column=2, row=5, sticky='w')
 
-        self.status = tk.StringVar(value='Idle')
-        ttk.Label(frm, textvariable=self.status).grid(column=0, row=6, columnspan=3, sticky='w')
+        self._cur_status = 'Idle'
+        self._status_label = ttk.Label(frm, text='Idle')
+        self._status_label.grid(column=0, row=6, columnspan=3, sticky='w')
 
         # disable preview if PRN template selected
         self.template_cb.bind('<<ComboboxSelected>>', lambda e: self.on_template_change())
         self.on_template_change()
 
+    def _toast(self, msg):
+        # self-hiding confirmation so auto-print never waits on a dialog
+        try:
+            lbl = ttk.Label(self.root, text=msg, relief='solid', padding=4)
+            lbl.place(relx=0.5, rely=1.0, anchor='s')
+            self.root.after(1500, lbl.destroy)
+        except Exception:
+            pass
+
+    def set_status(self, s):
+        # plain label + diff check instead of a StringVar: skips the Tcl
+        # variable trace machinery and no-ops on unchanged text
+        if s == self._cur_status:
+            return
+        self._cur_status = s
+        try:
+            self._status_label.configure(text=s)
+        except Exception:
+            pass
+
     def on_template_change(self):
         tpl = (self.template_var.get() or '')
         if tpl.lower().endswith('.prn'):
@@ -618,10 +1098,23 @@ class App:
             except Exception:
                 self.preview_btn.config(state='normal')
         self.settings['last_template'] = tpl
+        self._schedule_save()
+
+    def _schedule_save(self):
+        # coalesce rapid settings changes into one disk write 500 ms out
+        try:
+            if self._settings_after_id:
+                self.root.after_cancel(self._settings_after_id)
+            self._settings_after_id = self.root.after(500, self._flush_settings)
+        except Exception:
+            save_settings(self.settings)
+
+    def _flush_settings(self):
+        self._settings_after_id = None
         save_settings(self.settings)
 
     def open_options(self):
-        OptionsWindow(self.root, self.settings, apply_cb=self.apply_settings)
+        OptionsWindow(self.root, self.settings, apply_cb=self.apply_settings, app=self)
 
     def apply_settings(self):
         # reload templates folder and template list
@@ -629,28 +1122,148 @@ class App:
         TEMPLATES_DIR = self.settings.get('templates_dir', TEMPLATES_DIR)
         self.template_files = list_template_files(TEMPLATES_DIR)
         self.template_cb['values'] = self.template_files
+        self._reload_tpl_cache()
         # restore last template if present
         self.template_var.set(self.settings.get('last_template') or (self.template_files[0] if self.template_files else ''))
+        self._refresh_hot_settings()
         # update scale config (keeps running state)
         try:
-            self.scale.port = self.settings.get('scale_port', 'Simulate')
-            self.scale.baud = int(self.settings.get('scale_baud', 9600))
+            self.scale.port = self._scale_port
+            self.scale.baud = self._scale_baud
         except Exception:
             pass
-        save_settings(self.settings)
+        # evict cached handles whose config no longer matches the settings
+        self._close_printer(keep=(self._printer_port, self._printer_baud))
+        self._schedule_save()
+
+    def _refresh_hot_settings(self):
+        # hoisted copies of hot-path settings; print/listen paths then skip
+        # the dict lookups and str->int coercion per call
+        s = self.settings
+        self._printer_port = s.get('printer_port', 'COM1')
+        try:
+            self._printer_baud = int(s.get('printer_baud', 38400))
+        except Exception:
+            self._printer_baud = 38400
+        self._scale_port = s.get('scale_port', 'Simulate')
+        try:
+            self._scale_baud = int(s.get('scale_baud', 9600))
+        except Exception:
+            self._scale_baud = 9600
+
+    def _enqueue_print(self, payload, ok_msg):
+        # scale-driven prints skip the modal (it would halt throughput) and
+        # show a transient toast instead
+        confirm = bool(self.settings.get('confirm_prints', True)) and not self._auto_mode
+        self._print_q.put((payload, ok_msg, confirm))
+
+    def _print_worker(self):
+        # fast path: back-to-back prints on an unchanged port reuse the last
+        # handle directly, skipping the lock + cache lookup in _get_printer
+        last_ser = None
+        last_key = None
+        last_ts = 0.0
+        while True:
+            job = self._print_q.get()
+            if job is None:
+                return
+            jobs = [job]
+            # opportunistically coalesce queued labels so several share one
+            # write() instead of paying a syscall + USB round-trip each
+            size = len(job[0])
+            while len(jobs) < 8 and size < 4096:
+                try:
+                    nxt = self._print_q.get(timeout=0.05)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._print_q.put(None)
+                    break
+                jobs.append(nxt)
+                size += len(nxt[0])
+            buf = bytearray()
+            for payload, _, _ in jobs:
+                if buf and not buf.endswith(b'\n'):
+                    # never butt one job's last command against the next job's
+                    # first; a missing terminator would corrupt both
+                    buf += b'\n'
+                buf += payload.encode('ascii', errors='replace') if isinstance(payload, str) else payload
+            key = (self._printer_port, self._printer_baud)
+            try:
+                if (last_ser is not None and last_key == key
+                        and time.monotonic() - last_ts < 0.2 and last_ser.is_open):
+                    ser = last_ser
+                else:
+                    ser = self._get_printer()
+                send_prn_to_printer(key[0], key[1], bytes(buf), ser=ser)
+                last_ser, last_key, last_ts = ser, key, time.monotonic()
+                for _, ok_msg, confirm in jobs:
+                    if confirm:
+                        self._ui_q.put(lambda m=ok_msg: messagebox.showinfo('Printed', m))
+                    else:
+                        self._ui_q.put(lambda m=ok_msg: self._toast(m))
+            except Exception as e:
+                last_ser = None
+                self._close_printer()
+                msg = str(e)
+                self._ui_q.put(lambda m=msg: messagebox.showerror('Printer Error', m))
+
+    def _get_printer(self, key=None):
+        # opening a COM port is slow (driver init / DCB setup); keep handles open
+        if serial is None:
+            raise RuntimeError('pyserial not installed')
+        if key is None:
+            key = (self._printer_port, self._printer_baud)
+        with self._printer_lock:
+            ser = self._serial_cache.get(key)
+            if ser is None or not ser.is_open:
+                ser = serial.Serial(key[0], key[1], timeout=2, write_timeout=2)
+                self._serial_cache[key] = ser
+            return ser
+
+    def _close_printer(self, keep=None):
+        # close cached handles; pass keep=(port, baud) to retain the active one
+        with self._printer_lock:
+            for key in list(self._serial_cache):
+                if keep is not None and key == keep:
+                    continue
+                try:
+                    self._serial_cache[key].close()
+                except Exception:
+                    pass
+                del self._serial_cache[key]
+
+    def send_raw_prn(self, port, baud, payload):
+        # Options' printer test goes through the handle cache too: the port
+        # may already be held open by the persistent print connection, and
+        # COM ports are exclusive-open, so a second direct open would fail
+        ser = self._get_printer((port, int(baud)))
+        send_prn_to_printer(port, baud, payload, ser=ser)
 
     def load_product_list(self):
-        conn = sqlite3.connect(DB_FILE); c = conn.cursor(); c.execute('SELECT product_code,name,price_per_lb,tare,plu_upc FROM products'); rows = c.fetchall(); conn.close()
-        return [f"{r[0]} - {r[1]} (${r[2]:.2f}/lb, tare {r[3]:.3f}, PLU {r[4] or ''})" for r in rows]
+        # one query fills both the combobox strings and the per-code cache;
+        # reload_products re-runs it whenever the Product Manager changes
+        # rows. COALESCE keeps the None guards out of the Python side and
+        # ORDER BY gives the combobox a stable presorted list.
+        rows = self.conn.execute(
+            "SELECT product_code,name,price_per_lb,COALESCE(tare,0),COALESCE(plu_upc,'') "
+            "FROM products ORDER BY product_code").fetchall()
+        self._products_by_code = {
+            r[0]: {'product_code': r[0], 'name': r[1], 'price_per_lb': r[2],
+                   'price_cents': int(round(r[2] * 100)), 'tare': r[3], 'plu_upc': r[4]}
+            for r in rows
+        }
+        self._product_display = [f"{r[0]} - {r[1]} (${r[2]:.2f}/lb, tare {r[3]:.3f}, PLU {r[4]})" for r in rows]
+        return self._product_display
 
-    def open_product_manager(self): ProductManager(self.root, refresh_cb=self.reload_products)
+    def open_product_manager(self): ProductManager(self.root, refresh_cb=self.reload_products, conn=self.conn)
     def reload_products(self): self.product_combo['values'] = self.load_product_list()
 
     def manual_read(self):
         try:
             # ensure scale config up to date
-            self.scale.port = self.settings.get('scale_port', 'Simulate')
-            self.scale.baud = int(self.settings.get('scale_baud', 9600))
+            self.scale.port = self._scale_port
+            self.scale.baud = self._scale_baud
             w = self.scale.read_once()
         except Exception as e:
             messagebox.showerror('Error', f'Read failed: {e}')
@@ -664,21 +1277,24 @@ class App:
             messagebox.showerror('Error', 'Select product')
             return None
         pcode = val.split(' - ')[0].strip()
-        conn = sqlite3.connect(DB_FILE); c = conn.cursor(); c.execute('SELECT product_code,name,price_per_lb,tare,plu_upc FROM products WHERE product_code=?', (pcode,)); row = c.fetchone(); conn.close()
-        if not row:
+        prod = self._products_by_code.get(pcode)
+        if not prod:
             messagebox.showerror('Error', 'Product not found')
             return None
-        return {'product_code': row[0], 'name': row[1], 'price_per_lb': row[2], 'tare': row[3] or 0.0, 'plu_upc': row[4]}
+        return prod
 
     def generate_content(self, weight):
         prod = self.parse_selected_product()
         if not prod:
             return None
         net = max(0.0, float(weight) - float(prod.get('tare', 0.0)))
-        total = round(net * prod['price_per_lb'] + 1e-9, 2)
-        cents = int(round(total * 100))
+        # price math in integer cents/thousandths of a pound: one rounding
+        # step, no float drift, identical results on every platform
+        net_thousandths = int(round(net * 1000))
+        total_cents = (net_thousandths * prod['price_cents'] + 500) // 1000
+        total = total_cents / 100.0
         upc_src = prod.get('plu_upc') or prod['product_code']
-        upc_code = make_price_embedded_upc(upc_src, cents)
+        upc_code = make_price_embedded_upc(upc_src, total_cents)
         # return numeric values for PDF functions; strings for PRN substitution use formatting when rendering
         return {
             'product_name': prod['name'],
@@ -701,22 +1317,40 @@ class App:
         tpl_name = self.template_var.get()
         if not tpl_name or tpl_name.lower().endswith('.prn'):
             messagebox.showerror('Error', 'Preview not available for PRN templates'); return
-        tpl_path = os.path.join(self.settings.get('templates_dir', TEMPLATES_DIR), tpl_name)
-        try:
-            with open(tpl_path, 'r', encoding='utf-8') as f:
-                tpl = json.load(f)
-        except Exception as e:
-            messagebox.showerror('Error', f'Failed loading template: {e}'); return
+        tpl = self._get_template(tpl_name)
+        if not isinstance(tpl, dict):
+            messagebox.showerror('Error', 'Failed loading template'); return
         out = os.path.abspath('preview_label.pdf')
-        try:
-            generate_label_pdf(out, tpl, content)
-        except Exception as e:
-            messagebox.showerror('Error', f'PDF failed: {e}'); return
+        self._submit_pdf(out, tpl, content, self._preview_done)
+
+    def _submit_pdf(self, out, tpl, content, on_done):
+        # one render in flight at a time so clicks can't queue unbounded jobs
+        if self._pdf_busy:
+            self.set_status('PDF render in progress...')
+            return False
+        self._pdf_busy = True
+        if isinstance(content, dict):
+            content = (content,)
+        fut = self._pdf_pool.submit(generate_labels_pdf, out, tpl, content)
+        # completion hops through the polled UI queue like every other
+        # worker-to-Tk path; the executor thread never touches root.after
+        fut.add_done_callback(lambda f: self._ui_q.put(lambda: on_done(f, out)))
+        return True
+
+    def _preview_done(self, fut, out):
+        self._pdf_busy = False
+        err = fut.exception()
+        if err:
+            messagebox.showerror('Error', f'PDF failed: {err}'); return
         messagebox.showinfo('Preview', f'PDF generated: {out}')
         if sys.platform.startswith('win'):
             os.startfile(out)
 
     def print_action(self):
+        # availability was checked once at init; the button is disabled when
+        # pyserial is missing, so the steady-state path carries no check
+        if not self._serial_available:
+            return
         try:
             w = float(self.weight_var.get())
         except Exception:
@@ -728,62 +1362,98 @@ class App:
         if not tpl_name:
             messagebox.showerror('Error', 'No template selected'); return
         tpl_path = os.path.join(self.settings.get('templates_dir', TEMPLATES_DIR), tpl_name)
+        # N copies ride in one serial job: the rendered label is just
+        # repeated, so the port is opened and the job queued exactly once
+        copies = 1
+        if not self._auto_mode:
+            try:
+                copies = max(1, int(self.copies_var.get()))
+            except Exception:
+                copies = 1
         if tpl_name.lower().endswith('.prn'):
             prn = render_prn_template(tpl_path, content)
             if prn is None:
                 messagebox.showerror('Error', 'Failed to load PRN'); return
-            try:
-                if serial is None:
-                    raise RuntimeError('pyserial not installed')
-                send_prn_to_printer(self.settings.get('printer_port','COM1'), self.settings.get('printer_baud',38400), prn)
-                messagebox.showinfo('Printed', f"PRN sent to {self.settings.get('printer_port', 'COM1')}")
-            except Exception as e:
-                messagebox.showerror('Printer Error', str(e))
+            if copies > 1 and not prn.endswith('\n'):
+                # keep the last command of one copy from running into the next
+                prn += '\n'
+            self._enqueue_print(prn * copies, f"PRN sent to {self._printer_port}")
             return
         # JSON template path -> generate PDF and also optionally send Datamax commands
-        try:
-            with open(tpl_path, 'r', encoding='utf-8') as f:
-                tpl = json.load(f)
-        except Exception as e:
-            messagebox.showerror('Error', f'Failed loading template: {e}'); return
-        out = os.path.abspath(f"label_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-        try:
-            generate_label_pdf(out, tpl, content)
-        except Exception as e:
-            messagebox.showerror('PDF Error', str(e)); return
-        # create datamax commands and send to printer (optional)
-        datamax_cmds = generate_datamax_from_template(tpl, content, dpi=203)
-        try:
-            if serial is None:
-                raise RuntimeError('pyserial not installed')
-            send_prn_to_printer(self.settings.get('printer_port','COM1'), self.settings.get('printer_baud',38400), datamax_cmds)
-            messagebox.showinfo('Printed', f"PDF saved and Datamax commands sent to {self.settings.get('printer_port', 'COM1')}")
-        except Exception as e:
-            messagebox.showerror('Printer Error', str(e))
+        tpl = self._get_template(tpl_name)
+        if not isinstance(tpl, dict):
+            messagebox.showerror('Error', 'Failed loading template'); return
+        datamax_cmds = render_datamax(get_compiled_datamax(tpl_path, tpl, dpi=203), content) * copies
+        # PDF copies are opt-in and never generated on auto-prints; the label
+        # the user actually gets is the DPL job, and rapid scale triggers
+        # would otherwise burn reportlab time and litter the folder with PDFs
+        if self._auto_mode or not self.settings.get('save_pdf_copy', False):
+            self._enqueue_print(datamax_cmds, f"Datamax commands sent to {self._printer_port}")
+            return
+        t = time.localtime()
+        out = os.path.abspath(f"label_{t.tm_year:04d}{t.tm_mon:02d}{t.tm_mday:02d}_{t.tm_hour:02d}{t.tm_min:02d}{t.tm_sec:02d}.pdf")
+        # one canvas, one save: every copy is a page in the same PDF
+        if not self._submit_pdf(out, tpl, (content,) * copies,
+                                lambda f, o: self._print_pdf_done(f, o, datamax_cmds)):
+            # renderer busy: skip only the PDF copy, never the physical label
+            self._enqueue_print(datamax_cmds, f"Datamax commands sent to {self._printer_port}")
+
+    def _print_pdf_done(self, fut, out, datamax_cmds):
+        self._pdf_busy = False
+        err = fut.exception()
+        if err:
+            messagebox.showerror('PDF Error', str(err)); return
+        # send datamax commands to printer (optional)
+        self._enqueue_print(datamax_cmds, f"PDF saved and Datamax commands sent to {self._printer_port}")
 
     def handle_scale_print(self, weight):
-        # schedule on main thread
+        # unchanged value -> nothing to redraw or reprint
+        if weight == self._last_weight:
+            return
+        # debounce: an unstable scale can emit many samples while the piece
+        # settles; cancel any pending job so only the latest weight prints
         def job():
+            self._pending_print_id = None
+            self._last_weight = weight
             self.weight_var.set(weight)
-            self.status.set('Auto printing from scale')
-            self.print_action()
-            self.status.set('Idle')
+            # only paint the transient state when the print worker is backed
+            # up; a queue that drains immediately never shows it
+            if not self._print_q.empty():
+                self.set_status('Auto printing from scale')
+            self._auto_mode = True
+            try:
+                self.print_action()
+            finally:
+                self._auto_mode = False
+            self.root.after_idle(self.set_status, 'Idle')
+        def schedule():
+            if self._pending_print_id:
+                self.root.after_cancel(self._pending_print_id)
+            self._pending_print_id = self.root.after(250, job)
         try:
-            self.root.after(0, job)
+            self._ui_q.put(schedule)
         except Exception:
             pass
 
     def toggle_listen(self):
         if getattr(self.scale, '_running', False):
-            self.scale.stop(); self.status.set('Idle')
+            self.scale.stop(); self.set_status('Idle')
         else:
-            self.scale.port = self.settings.get('scale_port', 'Simulate'); self.scale.baud = int(self.settings.get('scale_baud', 9600))
-            self.scale.start(); self.status.set(f"Listening on {self.scale.port}@{self.scale.baud}")
+            self.scale.port = self._scale_port; self.scale.baud = self._scale_baud
+            self.scale.start(); self.set_status(f"Listening on {self.scale.port}@{self.scale.baud}")
 
     def open_product_manager(self):
-        ProductManager(self.root, refresh_cb=self.reload_products)
+        ProductManager(self.root, refresh_cb=self.reload_products, conn=self.conn)
 
     def on_close(self):
+        # flush any debounced settings write before teardown
+        try:
+            if self._settings_after_id:
+                self.root.after_cancel(self._settings_after_id)
+                self._settings_after_id = None
+            save_settings(self.settings)
+        except Exception:
+            pass
         try:
             # Save settings
             self.settings['last_port'] = self.port_var.get()
@@ -808,6 +1478,24 @@ class App:
         except Exception as e:
             print("DB close error:", e)
 
+        try:
+            if hasattr(self, "_pdf_pool"):
+                self._pdf_pool.shutdown(wait=False)
+        except Exception:
+            pass
+
+        try:
+            if hasattr(self, "_print_q"):
+                self._print_q.put(None)
+        except Exception:
+            pass
+
+        try:
+            if hasattr(self, "_serial_cache"):
+                self._close_printer()
+        except Exception:
+            pass
+
         # Always force destroy
         try:
             self.root.destroy()